@@ -0,0 +1,122 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, initializedcheck=False
+"""Parse and aggregate `city;temp` lines in one native pass over a buffer.
+
+Build in place from the repo root with `cythonize -i _agg.pyx`, which leaves
+_agg.*.so next to multicore.py (see [tool.setuptools] in pyproject.toml).
+"""
+from array import array
+
+from libc.string cimport memcmp
+
+cdef enum:
+    MAX_CITIES = 10000  # the challenge allows at most 10k distinct station names
+    TABLE_SIZE = 1 << 15  # power of two, > 2 * MAX_CITIES keeps probe chains short
+
+cdef unsigned long long FNV_OFFSET = 14695981039346656037ULL
+cdef unsigned long long FNV_PRIME = 1099511628211ULL
+
+
+cpdef tuple aggregate(const unsigned char[::1] buf):
+    """Aggregate every line of buf.
+
+    Returns (cities, mins, maxs, sums, counts): the city bytes in id order and
+    integer-tenths stats indexed by the same id, array('h') for mins/maxs and
+    array('q') for sums/counts.
+    """
+    cdef Py_ssize_t size = buf.shape[0]
+    cdef Py_ssize_t i = 0, j, city_start, city_len, slot
+    cdef Py_ssize_t n_cities = 0
+    cdef unsigned long long h
+    cdef long long cid, temp
+    cdef bint neg
+
+    # open-addressed FNV-1a table, -1 marks an empty slot
+    cdef unsigned long long[::1] keys = array("Q", bytes(8 * TABLE_SIZE))
+    cdef long long[::1] ids = array("q", b"\xff" * (8 * TABLE_SIZE))
+    # cities are kept as offset + length back into buf
+    cdef long long[::1] name_offs = array("q", bytes(8 * MAX_CITIES))
+    cdef long long[::1] name_lens = array("q", bytes(8 * MAX_CITIES))
+    # min/max of -999..999 tenths fit a short
+    mins = array("h", bytes(2 * MAX_CITIES))
+    maxs = array("h", bytes(2 * MAX_CITIES))
+    sums = array("q", bytes(8 * MAX_CITIES))
+    counts = array("q", bytes(8 * MAX_CITIES))
+    cdef short[::1] mins_v = mins
+    cdef short[::1] maxs_v = maxs
+    cdef long long[::1] sums_v = sums
+    cdef long long[::1] counts_v = counts
+
+    while i < size:
+        # city name up to ';', hashed on the way
+        city_start = i
+        h = FNV_OFFSET
+        while i < size and buf[i] != 59 and buf[i] != 10:  # b';', b'\n'
+            h = (h ^ buf[i]) * FNV_PRIME
+            i += 1
+        if i == size or buf[i] == 10:  # blank or malformed line, no ';'
+            i += 1
+            continue
+        city_len = i - city_start
+        i += 1
+
+        # temperature field up to '\n' (or the end of the buffer)
+        j = i
+        while j < size and buf[j] != 10:  # b'\n'
+            j += 1
+
+        # the sign and the field length fix every digit offset
+        neg = i < j and buf[i] == 45  # b'-'
+        if neg:
+            i += 1
+        if j - i < 3:  # shorter than d.d, nothing to parse
+            i = j + 1
+            continue
+        if j - i == 4:  # dd.d
+            temp = (buf[i] - 48) * 100 + (buf[i + 1] - 48) * 10 + (buf[i + 3] - 48)
+        else:  # d.d
+            temp = (buf[i] - 48) * 10 + (buf[i + 2] - 48)
+        if neg:
+            temp = -temp
+        i = j + 1
+
+        slot = <Py_ssize_t>(h & (TABLE_SIZE - 1))
+        while True:
+            cid = ids[slot]
+            if cid == -1:
+                if n_cities == MAX_CITIES:
+                    raise ValueError("more than %d distinct cities" % MAX_CITIES)
+                cid = n_cities
+                n_cities += 1
+                keys[slot] = h
+                ids[slot] = cid
+                name_offs[cid] = city_start
+                name_lens[cid] = city_len
+                mins_v[cid] = 999
+                maxs_v[cid] = -999
+                break
+            if (
+                keys[slot] == h
+                and name_lens[cid] == city_len
+                and memcmp(&buf[name_offs[cid]], &buf[city_start], city_len) == 0
+            ):
+                break
+            slot = (slot + 1) & (TABLE_SIZE - 1)
+
+        if temp < mins_v[cid]:
+            mins_v[cid] = temp
+        if temp > maxs_v[cid]:
+            maxs_v[cid] = temp
+        sums_v[cid] += temp
+        counts_v[cid] += 1
+
+    cities = [
+        bytes(buf[name_offs[k] : name_offs[k] + name_lens[k]])
+        for k in range(n_cities)
+    ]
+    return (
+        cities,
+        mins[:n_cities],
+        maxs[:n_cities],
+        sums[:n_cities],
+        counts[:n_cities],
+    )
@@ -1,20 +1,21 @@
 import time
-import sys
 import mmap
+from collections import defaultdict
 
 file = "data/measurements.txt"
 
 t0 = time.perf_counter()
 with open(file, "r+b") as inputfile:
     mm = mmap.mmap(inputfile.fileno(), 0, access=mmap.ACCESS_READ)
-    lines = []
-    for line in iter(mm.readline, b""):
-        lines.append(line.rstrip(b"\n"))
+    # lines keep their b'\n', parse_temp only reads up to the tenths digit
+    lines = list(iter(mm.readline, b""))
     mm.close()
 
 t1 = time.perf_counter()
 
-stats = {}  # city -> [minimum, max, sum, count]
+
+# city_bytes -> [min, max, sum, count]; 999/-999 lose to any first reading
+stats = defaultdict(lambda: [999, -999, 0, 0])
 
 
 def parse_temp(s: str) -> int:
@@ -31,22 +32,19 @@ def parse_temp(s: str) -> int:
 
 
 for line in lines:
-    city_bytes, temp_bytes = line.split(b";")
-    city = sys.intern(
-        city_bytes.decode("utf-8")
-    )  # Intern repeated city strings, should be faster
+    city_bytes, _, temp_bytes = line.partition(b";")
     temp = parse_temp(temp_bytes.decode("utf-8"))
 
-    stat = stats.get(city)
-    if stat:
-        stat[0] = min(stat[0], temp)
-        stat[1] = max(stat[1], temp)
-        stat[2] += temp
-        stat[3] += 1
-    else:
-        stats[city] = [temp, temp, temp, 1]  # minimum, max, sum
+    # keyed by the raw bytes, cities are only decoded for the report
+    stat = stats[city_bytes]
+    stat[0] = min(stat[0], temp)
+    stat[1] = max(stat[1], temp)
+    stat[2] += temp
+    stat[3] += 1
 
 
 t2 = time.perf_counter()
 print("Read:", t1 - t0, "s")
 print("Parse and Aggreagate", t2 - t1, "s")
+for city_bytes, stat in stats.items():
+    print(city_bytes.decode("utf-8"), stat)
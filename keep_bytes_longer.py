@@ -1,26 +1,30 @@
 import time
 import sys
 import mmap
+from collections import defaultdict
 
 file = "data/measurements.txt"
 
-stats = {}  # city -> [minimum, max, sum, count]
+
+# city -> [min, max, sum, count]; a new city's first reading passes both
+# if-checks below, so it sets min and max without a separate miss branch
+stats = defaultdict(lambda: [999, -999, 0, 0])
+
+DIG = tuple(range(-48, 256 - 48))  # DIG[b] == b - 48 for any byte b
 
 
 def parse_temp_bytes(b: bytes) -> int:
-    """Parse dd.d or -dd.d directly from bytes"""
-    neg = b[0] == 45
-    i = 1 if neg else 0
-    # Find the decimal point
-    dot_index = b.find(46, i)  # ASCII '.' is 46
-    # Convert ASCII bytes to integers
-    tens = b[i] - 48  # '0' is 48
-    ones = b[i + 1] - 48
-    tenths = b[dot_index + 1] - 48
-    temp = tens * 100 + ones * 10 + tenths
-    if neg:
-        temp = -temp
-    return temp
+    """Parse d.d, dd.d, -d.d or -dd.d directly from bytes"""
+    # The '.' position follows from the sign and the length, so every
+    # digit is read at a fixed offset without searching for it
+    n = len(b)
+    if b[0] == 45:  # ASCII '-' is 45
+        if n == 5:  # -dd.d
+            return -(DIG[b[1]] * 100 + DIG[b[2]] * 10 + DIG[b[4]])
+        return -(DIG[b[1]] * 10 + DIG[b[3]])  # -d.d
+    if n == 4:  # dd.d
+        return DIG[b[0]] * 100 + DIG[b[1]] * 10 + DIG[b[3]]
+    return DIG[b[0]] * 10 + DIG[b[2]]  # d.d
 
 
 t0 = time.perf_counter()
@@ -30,22 +34,19 @@ with open(file, "r+b") as inputfile:
 
     for line in iter(mm.readline, b""):
         line = line.rstrip(b"\n")
-        city_bytes, temp_bytes = line.split(b";")
+        city_bytes, _, temp_bytes = line.partition(b";")
         # city = sys.intern(city_bytes)  # Intern repeated city strings, should be faster
         temp = parse_temp_bytes(temp_bytes)
 
-        stat = stats.get(city_bytes)
-        if stat:
-            # stat[0] = min(stat[0], temp)
-            if temp < stat[0]:
-                stat[0] = temp
-            # stat[1] = max(stat[1], temp)
-            if temp > stat[1]:
-                stat[1] = temp
-            stat[2] += temp
-            stat[3] += 1
-        else:
-            stats[city_bytes] = [temp, temp, temp, 1]  # minimum, max, sum
+        stat = stats[city_bytes]
+        # stat[0] = min(stat[0], temp)
+        if temp < stat[0]:
+            stat[0] = temp
+        # stat[1] = max(stat[1], temp)
+        if temp > stat[1]:
+            stat[1] = temp
+        stat[2] += temp
+        stat[3] += 1
     mm.close()
 
 
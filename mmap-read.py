@@ -1,20 +1,12 @@
 import time
-import sys
 import mmap
+from collections import defaultdict
 
 file = "data/measurements.txt"
 
-t0 = time.perf_counter()
-with open(file, "r+b") as inputfile:
-    mm = mmap.mmap(inputfile.fileno(), 0, access=mmap.ACCESS_READ)
-    lines = []
-    for line in iter(mm.readline, b""):
-        lines.append(line.rstrip(b"\n").decode("utf-8"))
-    mm.close()
-
-t1 = time.perf_counter()
 
-stats = {}  # city -> [minimum, max, sum, count]
+# city_bytes -> [min, max, sum, count], starting out of range for -99.9..99.9
+stats = defaultdict(lambda: [999, -999, 0, 0])
 
 
 def parse_temp(s: str) -> int:
@@ -30,23 +22,36 @@ def parse_temp(s: str) -> int:
     return temp
 
 
-for line in lines:
-    city, temp_str = line.split(";")
-    city = sys.intern(city)  # Intern repeated city strings, should be faster
-    # negative case
-    temp = parse_temp(temp_str)
-    if city in stats:
+t0 = time.perf_counter()
+with open(file, "r+b") as inputfile:
+    mm = mmap.mmap(inputfile.fileno(), 0, access=mmap.ACCESS_READ)
+    # strictly sequential scan, let the kernel read ahead aggressively
+    try:
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+        mm.madvise(mmap.MADV_WILLNEED)
+    except AttributeError:  # no madvise on this platform
+        pass
+    t1 = time.perf_counter()  # end of "read", lines are parsed as they are read
+
+    for line in iter(mm.readline, b""):
+        # no rstrip, parse_temp only reads up to the tenths digit
+        # keyed by the raw bytes, cities are only decoded for the report
+        city, temp_bytes = line.split(b";")
+        # negative case
+        temp = parse_temp(temp_bytes.decode("utf-8"))
+        stat = stats[city]
         # if min
-        if temp < stats[city][0]:
-            stats[city][0] = temp
-        if temp > stats[city][1]:
-            stats[city][1] = temp
-        stats[city][2] += temp
-        stats[city][3] += 1
-    else:
-        stats[city] = [temp, temp, temp, 1]  # minimum, max, sum
+        if temp < stat[0]:
+            stat[0] = temp
+        if temp > stat[1]:
+            stat[1] = temp
+        stat[2] += temp
+        stat[3] += 1
+    mm.close()
 
 
 t2 = time.perf_counter()
 print("Read:", t1 - t0, "s")
 print("Parse and Aggreagate", t2 - t1, "s")
+for city, stat in stats.items():
+    print(city.decode("utf-8"), stat)
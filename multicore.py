@@ -1,114 +1,247 @@
-import mmap
 import multiprocessing as mp
 import os
 import time
+from array import array
+from multiprocessing import shared_memory
+
+import numpy as np
 
 file = "data/measurements.txt"
 
+DIG = tuple(range(-48, 256 - 48))  # indexed by a raw byte, DIG[0x37] == 7
+
+MAX_CITIES = 10_000  # the challenge allows at most 10k distinct station names
+MAX_NAME_LEN = 100  # station names are at most 100 bytes
+OVERLAP = 256  # bytes read past a chunk's end, more than one full line
+
+# field -> (dtype, row shape) of the shared result blocks, one row per chunk
+SHARED_FIELDS = {
+    "mins": (np.int16, (MAX_CITIES,)),
+    "maxs": (np.int16, (MAX_CITIES,)),
+    "sums": (np.int64, (MAX_CITIES,)),
+    "counts": (np.int32, (MAX_CITIES,)),
+    "name_lens": (np.int64, (MAX_CITIES,)),
+    "names": (np.uint8, (MAX_CITIES, MAX_NAME_LEN)),
+}
+
+
+def create_shared(num_rows: int):
+    """Create one shared memory block per result field."""
+    blocks = {}
+    for field, (dtype, shape) in SHARED_FIELDS.items():
+        size = num_rows * int(np.prod(shape)) * np.dtype(dtype).itemsize
+        blocks[field] = shared_memory.SharedMemory(create=True, size=size)
+    return blocks
 
-def process_chunk(start: int, end: int, file_path: str):
-    """Process a byte range of the file and return stats dict."""
-    stats = {}  # city_bytes -> [min, max, sum, count]
 
-    with open(file_path, "r+b") as f:
-        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
-
-        # move start to next newline if not at 0
-        if start != 0:
-            while mm[start] != 10:  # b'\n'
-                start += 1
-            start += 1
-
-        # extend end to include the last full line
-        file_size = mm.size()
-        if end < file_size:
-            while mm[end] != 10:
-                end += 1
-
-        pos = start
-        while pos < end:
-            line_end = mm.find(b"\n", pos, end)
-            if line_end == -1:
-                line_end = end
-            line = mm[pos:line_end]
-
-            sep = line.find(b";")
-            if sep == -1:
-                pos = line_end + 1
-                continue  # skip malformed lines
-
-            city = line[:sep]
-            temp_bytes = line[sep + 1 :]
-
-            # parse temperature in integer tenths (e.g., 12.3 -> 123)
-            neg = temp_bytes[0] == 45  # b'-'
-            i = 1 if neg else 0
-            dot_index = temp_bytes.find(46, i)  # b'.'
-
-            # support 1 or 2 digit whole numbers
-            if dot_index - i == 2:
-                tens = temp_bytes[i] - 48
-                ones = temp_bytes[i + 1] - 48
-            else:
-                tens = 0
-                ones = temp_bytes[i] - 48
-
-            tenths = temp_bytes[dot_index + 1] - 48
-            temp = tens * 100 + ones * 10 + tenths
-            if neg:
-                temp = -temp
-
-            stat = stats.get(city)
-            if stat:
-                if temp < stat[0]:
-                    stat[0] = temp
-                if temp > stat[1]:
-                    stat[1] = temp
-                stat[2] += temp
-                stat[3] += 1
-            else:
-                stats[city] = [temp, temp, temp, 1]
-
-            pos = line_end + 1
-
-        mm.close()
-
-    return stats
-
-
-def merge_stats(all_stats):
-    """Merge list of stats dicts into one."""
-    final_stats = {}
-    for s in all_stats:
-        for city, stat in s.items():
-            fs = final_stats.get(city)
-            if fs:
-                fs[0] = min(fs[0], stat[0])
-                fs[1] = max(fs[1], stat[1])
-                fs[2] += stat[2]
-                fs[3] += stat[3]
-            else:
-                final_stats[city] = stat
-    return final_stats
+def view_shared(blocks, num_rows: int):
+    """View the shared blocks as (num_rows, *row shape) arrays."""
+    return {
+        field: np.ndarray((num_rows, *shape), dtype=dtype, buffer=blocks[field].buf)
+        for field, (dtype, shape) in SHARED_FIELDS.items()
+    }
+
+
+def aggregate_chunk(chunk: memoryview):
+    """Aggregate the lines of chunk into (cities, mins, maxs, sums, counts)."""
+    stats = {}  # city_bytes -> [min, max, sum, count]
+    stats_get = stats.get  # bound once, not looked up again on every line
+
+    # splitlines needs bytes, the one copy the native aggregate avoids
+    for line in bytes(chunk).splitlines():
+        sep = line.find(b";")
+        if sep == -1 or len(line) - sep < 4:
+            continue  # skip blank and malformed lines, as _agg.aggregate does
+
+        city = line[:sep]
+        temp_bytes = line[sep + 1 :]
+
+        # parse temperature in integer tenths (e.g., 12.3 -> 123)
+        neg = temp_bytes[0] == 45  # b'-'
+        i = 1 if neg else 0
+        dot_index = temp_bytes.find(46, i)  # b'.'
+
+        # support 1 or 2 digit whole numbers
+        if dot_index - i == 2:
+            tens = DIG[temp_bytes[i]]
+            ones = DIG[temp_bytes[i + 1]]
+        else:
+            tens = 0
+            ones = DIG[temp_bytes[i]]
+
+        tenths = DIG[temp_bytes[dot_index + 1]]
+        temp = tens * 100 + ones * 10 + tenths
+        if neg:
+            temp = -temp
+
+        stat = stats_get(city)
+        if stat:
+            if temp < stat[0]:
+                stat[0] = temp
+            if temp > stat[1]:
+                stat[1] = temp
+            stat[2] += temp
+            stat[3] += 1
+        else:
+            stats[city] = [temp, temp, temp, 1]
+
+    # same SoA layout as _agg.aggregate, min/max of -999..999 tenths fit a short
+    values = stats.values()
+    return (
+        list(stats),
+        array("h", [stat[0] for stat in values]),
+        array("h", [stat[1] for stat in values]),
+        array("q", [stat[2] for stat in values]),
+        array("q", [stat[3] for stat in values]),
+    )
+
+
+try:
+    from _agg import aggregate  # native parse+aggregate, see _agg.pyx
+
+    AGGREGATE = "_agg (Cython)"
+except ImportError:  # extension not built, fall back to the pure-Python loop
+    aggregate = aggregate_chunk
+    AGGREGATE = "pure Python, build _agg.pyx for the native one"
+
+
+def process_chunk(
+    start: int, end: int, file_path: str, row: int, num_rows: int, shm_names
+):
+    """Process a byte range of the file into its row of the shared result blocks.
+
+    Returns the row and the number of distinct cities written to it.
+    """
+    # read just this chunk, plus enough overlap to finish its last line
+    length = end - start + OVERLAP
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        # hint the chunk's range as sequential so the kernel reads ahead
+        try:
+            os.posix_fadvise(fd, start, length, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(fd, start, length, os.POSIX_FADV_WILLNEED)
+        except AttributeError:  # no posix_fadvise on this platform
+            pass
+        buf = os.pread(fd, length, start)
+    finally:
+        os.close(fd)
+
+    # skip the partial first line if not at 0, the previous chunk owns it
+    first = buf.find(b"\n") + 1 if start != 0 else 0
+    # extend end to include the last full line
+    last = buf.find(b"\n", end - start)
+    if last == -1:
+        last = len(buf)
+
+    # a memoryview slice hands the chunk over without copying it
+    cities, mins, maxs, sums, counts = aggregate(memoryview(buf)[first:last])
+
+    # hand the SoA stats back through shared memory instead of pickling them
+    n = len(cities)
+    blocks = {
+        field: shared_memory.SharedMemory(name=name)
+        for field, name in shm_names.items()
+    }
+    shared = view_shared(blocks, num_rows)
+    shared["mins"][row, :n] = mins
+    shared["maxs"][row, :n] = maxs
+    shared["sums"][row, :n] = sums
+    shared["counts"][row, :n] = counts
+    names = shared["names"][row]
+    name_lens = shared["name_lens"][row]
+    for cid, city in enumerate(cities):
+        names[cid, : len(city)] = np.frombuffer(city, dtype=np.uint8)
+        name_lens[cid] = len(city)
+    del shared, names, name_lens  # release the views before closing
+    for shm in blocks.values():
+        shm.close()
+
+    return row, n
+
+
+def process_chunk_star(args):
+    """Unpack a chunk tuple, imap_unordered passes a single argument."""
+    return process_chunk(*args)
+
+
+def new_merge():
+    """Create the merge state: global city ids and stats indexed by them."""
+    info = np.iinfo(np.int16)
+    return {
+        "id_of": {},  # city_bytes -> global id
+        "mins": np.full(MAX_CITIES, info.max, dtype=np.int16),
+        "maxs": np.full(MAX_CITIES, info.min, dtype=np.int16),
+        "sums": np.zeros(MAX_CITIES, dtype=np.int64),
+        "counts": np.zeros(MAX_CITIES, dtype=np.int64),
+    }
+
+
+def merge_in_place(merged, shared, row: int, n: int):
+    """Reduce one finished chunk's shared row into the merge state."""
+    # map the chunk's local ids to global ids, the only per-city Python work
+    id_of = merged["id_of"]
+    names = shared["names"][row]
+    name_lens = shared["name_lens"][row]
+    gids = np.empty(n, dtype=np.int64)
+    for cid in range(n):
+        city = names[cid, : name_lens[cid]].tobytes()
+        gids[cid] = id_of.setdefault(city, len(id_of))
+
+    np.minimum.at(merged["mins"], gids, shared["mins"][row, :n])
+    np.maximum.at(merged["maxs"], gids, shared["maxs"][row, :n])
+    np.add.at(merged["sums"], gids, shared["sums"][row, :n])
+    np.add.at(merged["counts"], gids, shared["counts"][row, :n])
+
+
+def merge_stats(merged):
+    """Turn the merge state into a city_bytes -> stats dict."""
+    num_cities = len(merged["id_of"])
+    return {
+        city: [mn, mx, sm, cnt]
+        for city, mn, mx, sm, cnt in zip(
+            merged["id_of"],
+            merged["mins"][:num_cities].tolist(),
+            merged["maxs"][:num_cities].tolist(),
+            merged["sums"][:num_cities].tolist(),
+            merged["counts"][:num_cities].tolist(),
+        )
+    }
 
 
 if __name__ == "__main__":
+    print("Aggregate:", AGGREGATE)
     t0 = time.perf_counter()
 
     file_size = os.path.getsize(file)
     num_workers = mp.cpu_count()
-    chunk_size = file_size // num_workers
+    # several chunks per worker so no single slow chunk sets the wall time, but
+    # each longer than a line, or tiny files hand the first line to empty chunks
+    num_chunks = max(1, min(num_workers * 4, file_size // 128))
+    chunk_size = file_size // num_chunks
+
+    blocks = create_shared(num_chunks)
+    shm_names = {field: shm.name for field, shm in blocks.items()}
 
     chunks = []
-    for i in range(num_workers):
+    for i in range(num_chunks):
         start = i * chunk_size
-        end = file_size if i == num_workers - 1 else (i + 1) * chunk_size
-        chunks.append((start, end, file))
-
-    with mp.Pool(num_workers) as pool:
-        results = pool.starmap(process_chunk, chunks)
-
-    final_stats = merge_stats(results)
+        end = file_size if i == num_chunks - 1 else (i + 1) * chunk_size
+        chunks.append((start, end, file, i, num_chunks, shm_names))
+
+    shared = view_shared(blocks, num_chunks)
+    try:
+        merged = new_merge()
+        with mp.Pool(num_workers) as pool:
+            # merge each chunk as soon as it is done, in completion order
+            for row, n in pool.imap_unordered(process_chunk_star, chunks):
+                merge_in_place(merged, shared, row, n)
+
+        final_stats = merge_stats(merged)
+    finally:
+        del shared  # release the views before closing
+        for shm in blocks.values():
+            shm.close()
+            shm.unlink()
 
     t1 = time.perf_counter()
     print(f"Processed {file_size} bytes with {num_workers} cores in {t1 - t0:.3f} s")
@@ -0,0 +1,157 @@
+import time
+import mmap
+
+import numpy as np
+from numba import njit
+
+file = "data/measurements.txt"
+
+MAX_CITIES = 10_000  # the challenge allows at most 10k distinct station names
+MAX_NAME_LEN = 100  # station names are at most 100 bytes
+TABLE_SIZE = 1 << 15  # power of two, > 2 * MAX_CITIES keeps probe chains short
+
+FNV_OFFSET = np.uint64(14695981039346656037)
+FNV_PRIME = np.uint64(1099511628211)
+
+
+@njit(cache=True)
+def scan(
+    buf,
+    start,
+    end,
+    hash_table_keys,
+    hash_table_vals,
+    city_buf,
+    city_lens,
+    mins,
+    maxs,
+    sums,
+    counts,
+    n_cities,
+):
+    """Parse and aggregate the lines in buf[start:end] into the city arrays.
+
+    Returns the number of distinct cities seen so far, or -1 if a new city
+    would not fit in the MAX_CITIES-sized arrays.
+    """
+    mask = np.uint64(hash_table_keys.shape[0] - 1)
+    i = start
+    while i < end:
+        # City name up to ';' (59), FNV-1a hashed on the way
+        city_start = i
+        h = FNV_OFFSET
+        while i < end and buf[i] != 59 and buf[i] != 10:
+            h = (h ^ np.uint64(buf[i])) * FNV_PRIME
+            i += 1
+        if i == end or buf[i] == 10:  # blank or malformed line, no ';'
+            i += 1
+            continue
+        city_len = i - city_start
+        i += 1
+
+        # Temperature as integer tenths: [-]d[d].d up to '\n' (10) or end
+        j = i
+        while j < end and buf[j] != 10:
+            j += 1
+        neg = i < j and buf[i] == 45  # b'-'
+        if neg:
+            i += 1
+        if j - i < 3:  # shorter than d.d, nothing to parse
+            i = j + 1
+            continue
+        if j - i == 4:  # dd.d
+            temp = (buf[i] - 48) * 100 + (buf[i + 1] - 48) * 10 + (buf[i + 3] - 48)
+        else:  # d.d
+            temp = (buf[i] - 48) * 10 + (buf[i + 2] - 48)
+        if neg:
+            temp = -temp
+        i = j + 1
+
+        # Open addressing with linear probing, -1 marks an empty slot
+        slot = np.int64(h & mask)
+        while True:
+            cid = hash_table_vals[slot]
+            if cid == -1:
+                if n_cities == mins.shape[0]:
+                    return -1  # no bounds checks in nopython mode, bail out
+                cid = n_cities
+                n_cities += 1
+                hash_table_keys[slot] = h
+                hash_table_vals[slot] = cid
+                base = cid * MAX_NAME_LEN
+                for k in range(city_len):
+                    city_buf[base + k] = buf[city_start + k]
+                city_lens[cid] = city_len
+                mins[cid] = 999
+                maxs[cid] = -999
+                break
+            if hash_table_keys[slot] == h and city_lens[cid] == city_len:
+                base = cid * MAX_NAME_LEN
+                same = True
+                for k in range(city_len):
+                    if city_buf[base + k] != buf[city_start + k]:
+                        same = False
+                        break
+                if same:
+                    break
+            slot = np.int64(np.uint64(slot + 1) & mask)
+
+        # Aggregate
+        if temp < mins[cid]:
+            mins[cid] = temp
+        if temp > maxs[cid]:
+            maxs[cid] = temp
+        sums[cid] += temp
+        counts[cid] += 1
+
+    return n_cities
+
+
+if __name__ == "__main__":
+    hash_table_keys = np.zeros(TABLE_SIZE, dtype=np.uint64)
+    hash_table_vals = np.full(TABLE_SIZE, -1, dtype=np.int64)
+    city_buf = np.zeros(MAX_CITIES * MAX_NAME_LEN, dtype=np.uint8)
+    city_lens = np.zeros(MAX_CITIES, dtype=np.int64)
+    # temperatures are -999..999 tenths, so min/max fit int16
+    mins = np.zeros(MAX_CITIES, dtype=np.int16)
+    maxs = np.zeros(MAX_CITIES, dtype=np.int16)
+    sums = np.zeros(MAX_CITIES, dtype=np.int64)
+    counts = np.zeros(MAX_CITIES, dtype=np.int32)
+
+    t0 = time.perf_counter()
+    with open(file, "r+b") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = np.frombuffer(mm, dtype=np.uint8)
+        t1 = time.perf_counter()  # end of "read"
+
+        n_cities = scan(
+            buf,
+            0,
+            buf.shape[0],
+            hash_table_keys,
+            hash_table_vals,
+            city_buf,
+            city_lens,
+            mins,
+            maxs,
+            sums,
+            counts,
+            0,
+        )
+
+        del buf  # release the exported buffer before closing the mmap
+        mm.close()
+
+    if n_cities == -1:
+        raise ValueError(f"more than {MAX_CITIES} distinct cities")
+
+    t2 = time.perf_counter()
+    print("Read:", t1 - t0, "s")
+    print("Parse and Aggregate:", t2 - t1, "s")
+    print("Example city stats (first 5):")
+    for cid in range(min(n_cities, 5)):
+        base = cid * MAX_NAME_LEN
+        city = city_buf[base : base + city_lens[cid]].tobytes()
+        # decode for display only
+        stat = [int(mins[cid]), int(maxs[cid]), int(sums[cid]), int(counts[cid])]
+        print(city.decode("utf-8"), stat)
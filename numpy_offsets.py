@@ -0,0 +1,72 @@
+import time
+import mmap
+from collections import defaultdict
+
+import numpy as np
+
+file = "data/measurements.txt"
+
+BLOCK_SIZE = 64 * 1024 * 1024  # bytes scanned per vectorized offset search
+
+
+stats = defaultdict(lambda: [999, -999, 0, 0])  # city_bytes -> [min, max, sum, count]
+
+# ASCII code -> digit, so parse_temp_bytes never computes b[i] - 48
+DIG = tuple(range(-48, 256 - 48))
+
+
+def parse_temp_bytes(b: bytes) -> int:
+    """Parse d.d, dd.d, -d.d or -dd.d directly from bytes"""
+    # The '.' position follows from the sign and the length, so every
+    # digit is read at a fixed offset without searching for it
+    n = len(b)
+    if b[0] == 45:  # ASCII '-' is 45
+        if n == 5:  # -dd.d
+            return -(DIG[b[1]] * 100 + DIG[b[2]] * 10 + DIG[b[4]])
+        return -(DIG[b[1]] * 10 + DIG[b[3]])  # -d.d
+    if n == 4:  # dd.d
+        return DIG[b[0]] * 100 + DIG[b[1]] * 10 + DIG[b[3]]
+    return DIG[b[0]] * 10 + DIG[b[2]]  # d.d
+
+
+t0 = time.perf_counter()
+with open(file, "r+b") as inputfile:
+    mm = mmap.mmap(inputfile.fileno(), 0, access=mmap.ACCESS_READ)
+    arr = np.frombuffer(mm, dtype=np.uint8)
+    size = arr.shape[0]
+    t1 = time.perf_counter()  # end of "read"
+
+    block_start = 0
+    while block_start < size:
+        block = arr[block_start : block_start + BLOCK_SIZE]
+        # All newline / semicolon offsets of the block in one C pass each
+        nl = np.flatnonzero(block == 10)  # b'\n'
+        if block_start + BLOCK_SIZE >= size and block[-1] != 10:
+            nl = np.append(nl, block.shape[0])  # last line without '\n'
+        block_end = int(nl[-1]) + 1
+        sc = np.flatnonzero(block[:block_end] == 59)  # b';'
+
+        line_start = block_start
+        for sep, end in zip((sc + block_start).tolist(), (nl + block_start).tolist()):
+            city = mm[line_start:sep]
+            temp = parse_temp_bytes(mm[sep + 1 : end])
+
+            stat = stats[city]
+            if temp < stat[0]:
+                stat[0] = temp
+            if temp > stat[1]:
+                stat[1] = temp
+            stat[2] += temp
+            stat[3] += 1
+
+            line_start = end + 1
+
+        block_start += block_end
+
+    del arr, block  # release the exported buffers before closing the mmap
+    mm.close()
+
+
+t2 = time.perf_counter()
+print("Read:", t1 - t0, "s")
+print("Parse and Aggregate:", t2 - t1, "s")
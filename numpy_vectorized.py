@@ -0,0 +1,136 @@
+import time
+import mmap
+
+import numpy as np
+
+file = "data/measurements.txt"
+
+BLOCK_SIZE = 64 * 1024 * 1024  # bytes parsed per vectorized pass
+MAX_CITIES = 10_000  # the challenge allows at most 10k distinct station names
+
+FNV_OFFSET = np.uint64(14695981039346656037)
+FNV_PRIME = np.uint64(1099511628211)
+EIGHT = np.uint64(8)
+ALL_BYTES = np.uint64(0xFFFF_FFFF_FFFF_FFFF)
+
+# SoA stats indexed by a global city id
+gid_of = {}  # city_bytes -> global id
+cities = []  # global id -> city_bytes
+# temperatures are -999..999 tenths, so temps and min/max fit int16
+mins = np.full(MAX_CITIES, np.iinfo(np.int16).max, dtype=np.int16)
+maxs = np.full(MAX_CITIES, np.iinfo(np.int16).min, dtype=np.int16)
+sums = np.zeros(MAX_CITIES, dtype=np.int64)
+counts = np.zeros(MAX_CITIES, dtype=np.int32)
+
+
+def city_gid(city):
+    """Global id of city_bytes, the next free one the first time it is seen."""
+    gid = gid_of.get(city)
+    if gid is None:
+        gid = gid_of[city] = len(cities)
+        cities.append(city)
+    return gid
+
+
+def parse_temps(block, sc, nl):
+    """Integer tenths of every line's [-]d[d].d field, given ';' and '\\n' offsets."""
+    s = sc + 1
+    neg = block[s] == 45  # b'-'
+    p = s + neg
+    d0 = block[p].astype(np.int16) - 48
+    d1 = block[p + 1].astype(np.int16) - 48
+    d2 = block[p + 2].astype(np.int16) - 48
+    # p + 3 is the '\n' of a d.d field, which may be past a final unterminated line
+    d3 = block.take(p + 3, mode="clip").astype(np.int16) - 48
+    # 4 bytes after the sign is dd.d, 3 bytes is d.d
+    val = np.where(nl - p == 4, d0 * 100 + d1 * 10 + d3, d0 * 10 + d2)
+    return np.where(neg, -val, val)
+
+
+def hash_cities(block, starts, lens):
+    """FNV-1a hash of every line's city bytes, one vectorized step per byte."""
+    h = np.full(starts.shape[0], FNV_OFFSET, dtype=np.uint64)
+    for k in range(int(lens.max())):
+        live = lens > k
+        b = block[starts[live] + k].astype(np.uint64)
+        h[live] = (h[live] ^ b) * FNV_PRIME
+    return h
+
+
+def same_city(block, starts, lens, rep):
+    """Whether every line's city bytes equal those of line rep, per line.
+
+    Compares 8 bytes per step through an overlapping uint64 view of block. Lines
+    too close to the block's end for a whole word come back as different, which
+    only sends them to the lookup by their own bytes.
+    """
+    last = block.shape[0] - 8  # last offset a whole word can be read from
+    same = (lens == lens[rep]) & (starts + lens <= last)
+    if last < 0:
+        return same
+    words = np.ndarray((last + 1,), dtype="<u8", buffer=block, strides=(1,))
+    for k in range(0, int(lens.max()), 8):
+        live = same & (lens > k)
+        # keep only the city's bytes of a final partial word, little-endian
+        r = np.minimum(lens[live] - k, 8).astype(np.uint64)
+        mask = ALL_BYTES >> (EIGHT - r) * EIGHT
+        a = words[starts[live] + k]
+        b = words[starts[rep[live]] + k]
+        same[live] = (a ^ b) & mask == 0
+    return same
+
+
+t0 = time.perf_counter()
+with open(file, "r+b") as inputfile:
+    mm = mmap.mmap(inputfile.fileno(), 0, access=mmap.ACCESS_READ)
+    arr = np.frombuffer(mm, dtype=np.uint8)
+    size = arr.shape[0]
+    t1 = time.perf_counter()  # end of "read"
+
+    block_start = 0
+    while block_start < size:
+        block = arr[block_start : block_start + BLOCK_SIZE]
+        nl = np.flatnonzero(block == 10)  # b'\n'
+        if block_start + BLOCK_SIZE >= size and block[-1] != 10:
+            nl = np.append(nl, block.shape[0])  # last line without '\n'
+        block_end = int(nl[-1]) + 1
+        sc = np.flatnonzero(block[:block_end] == 59)  # b';'
+        starts = np.concatenate(([0], nl[:-1] + 1))
+
+        temps = parse_temps(block, sc, nl)
+
+        # Factorize the block's cities, only the distinct ones touch Python
+        lens = sc - starts
+        hashes, first, inverse = np.unique(
+            hash_cities(block, starts, lens), return_index=True, return_inverse=True
+        )
+        gids = np.empty(hashes.shape[0], dtype=np.int64)
+        for j, line in enumerate(first.tolist()):
+            gids[j] = city_gid(block[starts[line] : sc[line]].tobytes())
+        ids = gids[inverse]
+
+        # A hash is not a name: lines whose city differs from the first line
+        # with the same hash collided and are looked up by their own bytes
+        for line in np.flatnonzero(~same_city(block, starts, lens, first[inverse])):
+            ids[line] = city_gid(block[starts[line] : sc[line]].tobytes())
+
+        # Aggregate
+        np.minimum.at(mins, ids, temps)
+        np.maximum.at(maxs, ids, temps)
+        np.add.at(sums, ids, temps)
+        np.add.at(counts, ids, 1)
+
+        block_start += block_end
+
+    del arr, block  # release the exported buffers before closing the mmap
+    mm.close()
+
+
+t2 = time.perf_counter()
+print("Read:", t1 - t0, "s")
+print("Parse and Aggregate:", t2 - t1, "s")
+print("Example city stats (first 5):")
+for gid, city in enumerate(cities[:5]):
+    # decode for display only
+    stat = [int(mins[gid]), int(maxs[gid]), int(sums[gid]), int(counts[gid])]
+    print(city.decode("utf-8"), stat)
@@ -3,34 +3,49 @@ import mmap
 
 file = "data/measurements.txt"
 
+# byte -> digit value, a tuple load returns a cached small int instead of
+# allocating the result of b - 48
+DIG = tuple(range(-48, 256 - 48))
+
 stats = {}  # city_bytes -> [min, max, sum, count]
 
 t0 = time.perf_counter()
 with open(file, "r+b") as f:
     mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    # strictly sequential scan, let the kernel read ahead aggressively
+    try:
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+        mm.madvise(mmap.MADV_WILLNEED)
+    except AttributeError:  # no madvise on this platform
+        pass
+    data = mm[:]  # one bulk copy instead of a readline call per line
     t1 = time.perf_counter()  # end of "read"
 
-    for line in iter(mm.readline, b""):
+    stats_get = stats.get  # bound once, not looked up again on every line
+
+    # splitlines does the whole split in a single C pass and drops the b'\n'
+    for line in data.splitlines():
         # Find separator
         sep = line.find(b";")
         city = line[:sep]
-        temp_bytes = line[sep + 1 : -1]  # assume line ends with b'\n'
-
-        # Inline parse temp
-        neg = temp_bytes[0] == 45  # b'-'
-        i = 1 if neg else 0
-        # Find decimal point
-        dot_index = temp_bytes.find(46, i)  # b'.'
-        # Convert to integer tenths
-        tens = temp_bytes[i] - 48
-        ones = temp_bytes[i + 1] - 48
-        tenths = temp_bytes[dot_index + 1] - 48
-        temp = tens * 100 + ones * 10 + tenths
-        if neg:
-            temp = -temp
+
+        # Inline parse temp at fixed offsets, no search for the '.'
+        i = sep + 1
+        n = len(line) - i
+        if line[i] == 45:  # b'-'
+            if n == 5:  # -dd.d
+                temp = -(
+                    DIG[line[i + 1]] * 100 + DIG[line[i + 2]] * 10 + DIG[line[i + 4]]
+                )
+            else:  # -d.d
+                temp = -(DIG[line[i + 1]] * 10 + DIG[line[i + 3]])
+        elif n == 4:  # dd.d
+            temp = DIG[line[i]] * 100 + DIG[line[i + 1]] * 10 + DIG[line[i + 3]]
+        else:  # d.d
+            temp = DIG[line[i]] * 10 + DIG[line[i + 2]]
 
         # Aggregate
-        stat = stats.get(city)
+        stat = stats_get(city)
         if stat:
             if temp < stat[0]:
                 stat[0] = temp